@@ -5,9 +5,15 @@ publib
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from .main import set_style, fix_style
+from .main import set_style, fix_style, available_styles, describe_style, register_style_dir
 from .tools.colors import colors, keep_color, get_next_color
 from .tools.tools import reset_defaults, regenerate_fonts
+from .tools.shared import plot_in_workers
+from .tools.render import render, arender
+from .tools.labels import label_points
+from .tools.stream import plot_stream
+from .tools.export import save_tiled
+from .tools.restyle import restyle, restyle_figure
 
 def __get_version__():
     from os.path import join, dirname
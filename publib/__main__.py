@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+Run the ``publib`` command with ``python -m publib``
+"""
+
+import sys
+
+from publib.cli import main
+
+sys.exit(main())
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+Command-line entry point
+
+Use::
+
+    publib render scripts/*.py --style article,latex --fmt pdf -j 8
+    publib render data/*.npy --style poster --fmt png --profile
+    publib restyle figures/*.pkl --style article_s --fmt pdf
+    publib styles
+
+``render`` runs plot scripts (``.py``), or plots data files (``.npy``,
+``.csv``, ``.txt``, ``.dat``: first column is x if there are several), in a
+pool of workers where the style is set once. Every figure is fixed with
+:func:`~publib.main.fix_style` and saved. Throughput and latency percentiles
+are printed at the end, and ``--profile`` adds the time spent in each phase.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+
+PHASES = ['style', 'load', 'plot', 'fix', 'save']
+
+DATA_EXTENSIONS = ['.npy', '.csv', '.txt', '.dat']
+
+
+# %% Workers
+
+_style_time = 0
+
+
+def _init_worker(style, backend):
+    global _style_time
+    t0 = time.time()
+    import matplotlib
+    matplotlib.use(backend)
+    from publib.main import set_style
+    matplotlib.rcdefaults()
+    set_style(style)
+    _style_time = time.time() - t0
+
+
+def _render_file(path, style, fmt, out_dir, fix):
+    ''' Plot ``path`` and save its figures.
+
+    Returns
+    -------
+    path, list of output files, dict of phase timings (s), error message or None
+    '''
+    global _style_time
+    import matplotlib.pyplot as plt
+    from publib.main import fix_style
+
+    # style is set once per worker: count it on its first file only
+    timings = dict.fromkeys(PHASES, 0.)
+    timings['style'], _style_time = _style_time, 0
+    outs = []
+
+    try:
+        plt.close('all')
+        ext = os.path.splitext(path)[1].lower()
+        if ext == '.py':
+            t0 = time.time()
+            _run_script(path)
+            timings['plot'] = time.time() - t0
+        elif ext in DATA_EXTENSIONS:
+            t0 = time.time()
+            data = _load_data(path)
+            timings['load'] = time.time() - t0
+            t0 = time.time()
+            _plot_data(data)
+            timings['plot'] = time.time() - t0
+        else:
+            raise ValueError('Unknown file type: {0}. Expected .py or one of {1}'.format(
+                path, DATA_EXTENSIONS))
+
+        figs = [plt.figure(n) for n in plt.get_fignums()]
+
+        if fix:
+            t0 = time.time()
+            for fig in figs:
+                for ax in fig.axes:
+                    fix_style(style, ax)
+            timings['fix'] = time.time() - t0
+
+        t0 = time.time()
+        stem = _get_stem(path, out_dir)
+        for i, fig in enumerate(figs):
+            out = '{0}{1}.{2}'.format(stem, '_{0}'.format(i + 1) if i else '', fmt)
+            fig.savefig(out, format=fmt)
+            outs.append(out)
+        timings['save'] = time.time() - t0
+        error = None
+    except Exception as err:
+        error = '{0}: {1}'.format(type(err).__name__, err)
+    finally:
+        plt.close('all')
+
+    return path, outs, timings, error
+
+
+def _get_stem(path, out_dir):
+    ''' Output file of ``path``, without the figure number and extension '''
+    if out_dir is None:
+        out_dir = os.path.dirname(path)
+    return os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0])
+
+
+def _run_script(path):
+    import runpy
+    import matplotlib as mpl
+    # rcParams changed by the script must not leak to the next files
+    with warnings.catch_warnings(), mpl.rc_context():
+        # plt.show() on a non-interactive backend
+        warnings.simplefilter('ignore', UserWarning)
+        try:
+            runpy.run_path(path, run_name='__main__')
+        except SystemExit as err:
+            # sys.exit() in the script: only a non-zero code is a failure
+            if err.code not in (None, 0):
+                raise RuntimeError('script exited with code {0}'.format(err.code))
+
+
+def _load_data(path):
+    import numpy as np
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.npy':
+        return np.load(path)
+    return np.loadtxt(path, delimiter=',' if ext == '.csv' else None, ndmin=1)
+
+
+def _plot_data(data):
+    import matplotlib.pyplot as plt
+    plt.figure()
+    if data.ndim == 2 and data.shape[1] > 1:
+        plt.plot(data[:, 0], data[:, 1:])
+    else:
+        plt.plot(data)
+
+
+# %% Commands
+
+def render(paths, style='basic', fmt=None, out_dir=None, processes=None,
+           fix=True, mpl_backend='Agg'):
+    ''' Render plot scripts or data files in parallel
+
+    Returns
+    -------
+    list of ``(path, outputs, timings, error)`` in the order of completion,
+    and the total time (s)
+    '''
+    from publib.main import _get_savefig_format
+
+    if fmt is None:
+        fmt = _get_savefig_format(style)
+    if out_dir is not None and not os.path.exists(out_dir):
+        os.makedirs(out_dir)
+    paths = [os.path.abspath(p) for p in paths]
+
+    stems = {}
+    for p in paths:
+        stem = _get_stem(p, out_dir)
+        if stem in stems:
+            raise ValueError('{0} and {1} would be saved to the same files {2}.{3}. '.format(
+                stems[stem], p, stem, fmt) + 'Rename one of them, or render them separately')
+        stems[stem] = p
+
+    results = []
+    t0 = time.time()
+    if processes == 1:
+        _init_worker(style, mpl_backend)
+        for p in paths:
+            results.append(_render_file(p, style, fmt, out_dir, fix))
+            _print_result(results[-1])
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(style, mpl_backend)) as pool:
+            futures = [pool.submit(_render_file, p, style, fmt, out_dir, fix) for p in paths]
+            for f in as_completed(futures):
+                results.append(f.result())
+                _print_result(results[-1])
+
+    return results, time.time() - t0
+
+
+def _print_result(result):
+    path, outs, timings, error = result
+    if error is not None:
+        print('FAILED {0}: {1}'.format(path, error), file=sys.stderr)
+    else:
+        print('{0} -> {1} ({2:.0f} ms)'.format(path, ', '.join(outs),
+                                              sum(timings.values()) * 1e3))
+
+
+def _summary(results, elapsed):
+    ''' Throughput and latency percentiles '''
+    import numpy as np
+
+    ok = [r for r in results if r[3] is None]
+    nfig = sum(len(r[1]) for r in ok)
+    lines = ['Rendered {0}/{1} files ({2} figures) in {3:.2f}s: {4:.1f} files/s, {5:.1f} figures/s'.format(
+        len(ok), len(results), nfig, elapsed, len(ok) / elapsed, nfig / elapsed)]
+    if ok:
+        lat = np.array([sum(r[2].values()) for r in ok]) * 1e3
+        lines.append('Latency (ms): p50 {0:.0f}, p90 {1:.0f}, p99 {2:.0f}, max {3:.0f}'.format(
+            *np.percentile(lat, [50, 90, 99, 100])))
+    return '\n'.join(lines)
+
+
+def _profile(results):
+    ''' Per-phase timings, in ms '''
+    import numpy as np
+
+    ok = [r for r in results if r[3] is None]
+    profile = {}
+    for phase in PHASES:
+        t = np.array([r[2][phase] for r in ok]) * 1e3
+        if not len(t):
+            t = np.zeros(1)
+        profile[phase] = {'total': float(t.sum()), 'mean': float(t.mean()),
+                          'p50': float(np.percentile(t, 50)),
+                          'p90': float(np.percentile(t, 90)),
+                          'max': float(t.max())}
+    return profile
+
+
+def _format_profile(profile):
+    lines = ['{0:<6} {1:>10} {2:>8} {3:>8} {4:>8} {5:>8}'.format(
+        'phase', 'total(ms)', 'mean', 'p50', 'p90', 'max')]
+    for phase, p in profile.items():
+        lines.append('{0:<6} {1:>10.1f} {2:>8.1f} {3:>8.1f} {4:>8.1f} {5:>8.1f}'.format(
+            phase, p['total'], p['mean'], p['p50'], p['p90'], p['max']))
+    return '\n'.join(lines)
+
+
+def _get_parser():
+
+    parser = argparse.ArgumentParser(prog='publib',
+                                     description='Produce publication-level quality images on top of Matplotlib')
+    sub = parser.add_subparsers(dest='command')
+
+    def add_common(p):
+        p.add_argument('paths', nargs='+')
+        p.add_argument('-s', '--style', default='basic',
+                       help='style, or comma-separated styles applied in order. Default: basic')
+        p.add_argument('-f', '--fmt', default=None,
+                       help='output format. Default: savefig.format of the style')
+        p.add_argument('-o', '--out-dir', default=None,
+                       help='output directory. Default: next to each input file')
+        p.add_argument('-j', '--processes', type=int, default=None,
+                       help='number of worker processes. Default: number of CPUs')
+
+    p = sub.add_parser('render', help='render plot scripts (.py) or data files ({0})'.format(
+        ', '.join(DATA_EXTENSIONS)))
+    add_common(p)
+    p.add_argument('--no-fix', action='store_true', help='do not call fix_style')
+    p.add_argument('--profile', nargs='?', const='-', default=None, metavar='FILE',
+                   help='print per-phase timings, or write them to FILE as JSON')
+
+    p = sub.add_parser('restyle', help='restyle pickled figures')
+    add_common(p)
+
+    sub.add_parser('styles', help='list available styles')
+
+    return parser
+
+
+def main(args=None):
+    ''' Run the ``publib`` command. Returns the exit code '''
+
+    parser = _get_parser()
+    args = parser.parse_args(args)
+
+    if args.command == 'styles':
+        from publib.main import available_styles
+        print('\n'.join(available_styles()))
+        return 0
+
+    if args.command is None:
+        parser.print_help()
+        return 2
+
+    style = args.style.split(',')
+
+    if args.command == 'restyle':
+        from publib.tools.restyle import restyle
+        outs = restyle(args.paths, style=style, processes=args.processes, fmt=args.fmt,
+                       out_dir=args.out_dir)
+        return 1 if None in outs else 0
+
+    results, elapsed = render(args.paths, style=style, fmt=args.fmt, out_dir=args.out_dir,
+                              processes=args.processes, fix=not args.no_fix)
+    print(_summary(results, elapsed))
+
+    if args.profile is not None:
+        profile = _profile(results)
+        if args.profile == '-':
+            print(_format_profile(profile))
+        else:
+            with open(args.profile, 'w') as f:
+                json.dump(profile, f, indent=2)
+
+    return 1 if any(r[3] is not None for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
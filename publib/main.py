@@ -64,6 +64,7 @@ import matplotlib.pyplot as plt
 import matplotlib as mpl
 import os
 from os.path import dirname, join
+from weakref import WeakKeyDictionary
 from six import string_types
 
 style_params = {
@@ -71,6 +72,7 @@ style_params = {
               'draggable_legend': False,
               'draggable_text': False,
               'tight_layout': True,
+              'layout': 'tight',     # 'tight' or 'constrained'
               'labelpad': 10,
               },
     'article': {'clean_spines': False,
@@ -115,11 +117,7 @@ def set_style(style='basic', **kwargs):
 
     '''
 
-    style = _read_style(style)
-
-    # Add basic style as the first style
-    if style[0] != 'basic':
-        style = ['basic'] + style
+    style = _add_basic(_read_style(style))
 
     # Apply all styles
     for s in style:
@@ -128,17 +126,12 @@ def set_style(style='basic', **kwargs):
 
 def _set_style(style, **kwargs):
 
-    stl = _get_style(style)
-
-    if not os.path.exists(stl):
-#        avail = os.listdir()
-        avail = [f.replace('.mplstyle', '') for f in os.listdir(
-            _get_lib()) if f.endswith('.mplstyle')]
-        raise ValueError('{0} is not a valid style. '.format(stl) +
+    if not style in _catalog:
+        raise ValueError('{0} is not a valid style. '.format(style) +
                          'Please pick a style from the list available in ' +
-                         '{0}: {1}'.format(_get_lib(), avail))
+                         '{0}: {1}'.format(_style_dirs, available_styles()))
 
-    mpl.style.use(stl)
+    mpl.style.use(_catalog[style]['rcParams'])
 
     for k in kwargs:
         mpl.rcParams[k] = kwargs[k]
@@ -165,6 +158,8 @@ def fix_style(style='basic', ax=None, **kwargs):
             
         >>> tight_layout=False
 
+        >>> layout='constrained'
+
     Examples
     --------
     
@@ -187,9 +182,9 @@ def fix_style(style='basic', ax=None, **kwargs):
 
     # Apply all styles
     for s in style:
-        if not s in style_params.keys():
+        if not (s in _catalog or s in style_params):
             raise ValueError('{0} is not a valid style. '.format(s)+
-                    'Please pick a style from the following: {0}. '.format(style_params.keys())+\
+                    'Please pick a style from the following: {0}. '.format(available_styles())+\
                     'Or update `style_params` in publib.main.py')
 
     _fix_style(style, ax, **kwargs)
@@ -198,11 +193,11 @@ def fix_style(style='basic', ax=None, **kwargs):
 def _fix_style(styles, ax=None, **kwargs):
 
     # Start with basic params
-    params = style_params['basic']
+    params = dict(style_params['basic'])
 
     # Apply all styles params
     for s in styles:
-        for p, v in style_params[s].items():
+        for p, v in style_params.get(s, {}).items():
             params[p] = v
 
     # User defined params:
@@ -225,10 +220,6 @@ def _fix_style(styles, ax=None, **kwargs):
         ax.spines['right'].set_visible(False)
         ax.spines['top'].set_visible(False)
 
-    # Tight layout
-    if params['tight_layout']:
-        plt.tight_layout()
-
     # Labelpads, offsets, etc.
     ax.xaxis.labelpad = params['labelpad']
     ax.yaxis.labelpad = params['labelpad']
@@ -254,13 +245,66 @@ def _fix_style(styles, ax=None, **kwargs):
                 l.draggable(True)
 
     if params['draggable_text']:
-        for t in ax.get_children():
+        for t in ax.texts:
             if type(t) == mpl.text.Annotation:
                 t.draggable(True)
 
+    # Layout (last, once labels and offsets are set)
+    if params['tight_layout']:
+        _fix_layout(ax.figure, params['layout'])
+
     return
 
 
+_layout_keys = WeakKeyDictionary()   # figure: geometry of its last tight layout
+
+def _fix_layout(fig, layout):
+    ''' Apply the layout engine to the figure of the axe.
+
+    With 'constrained', layout is computed by Matplotlib at draw time.
+    With 'tight', it is computed now, unless nothing it depends on changed
+    since the last call on this figure (see :py:func:`~publib.main._get_layout_key`).
+    '''
+
+    if layout == 'constrained':
+        if not isinstance(fig.get_layout_engine(), mpl.layout_engine.ConstrainedLayoutEngine):
+            fig.set_layout_engine('constrained')
+
+    elif layout == 'tight':
+        if _layout_keys.get(fig) != _get_layout_key(fig):
+            fig.tight_layout()
+            # after the layout, so that moving the axes later invalidates it
+            _layout_keys[fig] = _get_layout_key(fig)
+
+    else:
+        raise ValueError("layout should be one of 'tight', 'constrained'. Got {0}".format(layout))
+
+
+def _get_layout_key(fig):
+    ''' Everything a tight layout depends on: figure size, texts (figure
+    texts such as suptitle, labels, titles, tick labels, legends), axes
+    limits and positions '''
+
+    def texts(artists):
+        return tuple((t.get_text(), t.get_fontsize(), t.get_visible()) for t in artists)
+
+    def legend(leg):
+        if leg is None:
+            return None
+        return (texts(leg.get_texts()), leg.get_visible())
+
+    return (tuple(fig.get_size_inches()), fig.dpi, texts(fig.texts),
+            tuple(legend(leg) for leg in fig.legends),
+            tuple((texts([ax.xaxis.label, ax.yaxis.label, ax.title]),
+                   texts(ax.get_xticklabels()), texts(ax.get_yticklabels()),
+                   legend(ax.get_legend()),
+                   # tick labels are only updated at draw time
+                   ax.get_xlim(), ax.get_ylim(), ax.get_xscale(), ax.get_yscale(),
+                   ax.xaxis.labelpad, ax.yaxis.labelpad,
+                   tuple(ax.get_position().bounds), ax.get_visible())
+                  for ax in fig.axes))
+
+
 def _read_style(style):
     ''' Deal with different style format (str, list, tuple)
     
@@ -279,16 +323,101 @@ def _read_style(style):
     return style
 
 
-def _get_style(style):
-    ''' Get absolute path of style file '''
-    return join(_get_lib(),'{0}.mplstyle'.format(style))
+def _add_basic(style):
+    ''' Styles applied by :py:func:`~publib.main.set_style` for a list of
+    styles: 'basic' is added first, unless the list already starts with it '''
+
+    if style[0] != 'basic':
+        style = ['basic'] + style
+
+    return style
 
 def _get_lib():
     ''' Get absolute path of styles '''
     return join(dirname(os.path.realpath(__file__)),'stylelib')
 
+# %% Style catalog
+
+_catalog = {}       # style name: {'path', 'rcParams'}
+_style_dirs = []
+
+
+def register_style_dir(path):
+    ''' Add all ``.mplstyle`` files of ``path`` to the styles available in
+    :py:func:`~publib.main.set_style`. Styles with the same name as an existing
+    one replace it. Fix parameters of new styles can be added to
+    ``publib.main.style_params``.
+
+    Examples
+    --------
+    >>> register_style_dir('~/my_styles')
+    >>> set_style(['article', 'my_journal'])
+
+    '''
+
+    path = os.path.abspath(os.path.expanduser(path))
+
+    for f in sorted(os.listdir(path)):
+        if not f.endswith('.mplstyle'):
+            continue
+        stl = join(path, f)
+        rc = mpl.rc_params_from_file(stl, use_default_template=False)
+        _catalog[f[:-len('.mplstyle')]] = {'path': stl, 'rcParams': dict(rc)}
+
+    if path not in _style_dirs:
+        _style_dirs.append(path)
+
+
+def available_styles():
+    ''' List the names of the styles available in :py:func:`~publib.main.set_style` '''
+
+    return sorted(_catalog)
+
+
+def describe_style(style):
+    ''' Describe what a style does
+
+    Returns
+    -------
+
+    dict with keys:
+
+    - ``path``: style file
+    - ``rcParams``: rcParams set by the style file
+    - ``fix_params``: parameters used by :py:func:`~publib.main.fix_style`,
+      including the ones inherited from 'basic'
+    - ``requires``: styles applied before this one by :py:func:`~publib.main.set_style`.
+      ``set_style`` always applies 'basic' first, so this is ``['basic']`` for
+      all styles but 'basic' itself
+
+    '''
+
+    if not style in _catalog:
+        raise ValueError('{0} is not a valid style. '.format(style) +
+                         'Please pick a style from the following: {0}'.format(available_styles()))
+
+    fix_params = dict(style_params['basic'])
+    fix_params.update(style_params.get(style, {}))
+
+    return {'path': _catalog[style]['path'],
+            'rcParams': dict(_catalog[style]['rcParams']),
+            'fix_params': fix_params,
+            'requires': _add_basic([style])[:-1],
+            }
+
+
+def _get_savefig_format(style):
+    ''' savefig.format of the last style that sets it '''
+
+    fmt = mpl.rcParamsDefault['savefig.format']
+    for s in _add_basic(_read_style(style)):
+        fmt = _catalog.get(s, {}).get('rcParams', {}).get('savefig.format', fmt)
+    return fmt
+
+
 # %% On start-up
 
+register_style_dir(_get_lib())
 set_style('basic')        # whenever publib is imported
 
 
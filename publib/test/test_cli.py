@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+
+"""
+
+import json
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from publib.cli import main
+
+
+def test_cli(*args, **kwargs):
+    ''' Scripts and data files are rendered, and timings are dumped '''
+
+    path = tempfile.mkdtemp()
+    script = os.path.join(path, 'script.py')
+    with open(script, 'w') as f:
+        f.write('import matplotlib.pyplot as plt\n'
+                'plt.plot([0, 1], [0, 1])\n'
+                'plt.figure()\n'
+                'plt.plot([1, 0])\n'
+                'plt.show()\n')
+    data = os.path.join(path, 'data.csv')
+    np.savetxt(data, np.random.rand(10, 3), delimiter=',')
+    profile = os.path.join(path, 'profile.json')
+
+    assert main(['render', script, data, '-s', 'article,B&W', '-f', 'png',
+                 '-j', '1', '--profile', profile]) == 0
+    for name in ['script.png', 'script_2.png', 'data.png']:
+        assert os.path.exists(os.path.join(path, name))
+    with open(profile) as f:
+        assert set(json.load(f)) == {'style', 'load', 'plot', 'fix', 'save'}
+
+    # Failures are reported, and do not stop the batch
+    assert main(['render', script, os.path.join(path, 'missing.npy'),
+                 '-f', 'png', '-j', '2']) == 1
+
+    assert main(['styles']) == 0
+
+    # Files with the same name would overwrite each other's figures
+    try:
+        main(['render', script, os.path.join(path, 'script.csv'), '-f', 'png'])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('output collision not detected')
+
+
+def test_cli_exit(*args, **kwargs):
+    ''' sys.exit() in a script does not stop the batch '''
+
+    path = tempfile.mkdtemp()
+    scripts = []
+    for name, code in [('ok', 0), ('fails', 3)]:
+        scripts.append(os.path.join(path, name + '.py'))
+        with open(scripts[-1], 'w') as f:
+            f.write('import sys\n'
+                    'import matplotlib.pyplot as plt\n'
+                    'plt.plot([0, 1], [0, 1])\n'
+                    'if __name__ == "__main__":\n'
+                    '    sys.exit({0})\n'.format(code))
+
+    for processes in ['1', '2']:
+        assert main(['render'] + scripts + ['-f', 'png', '-j', processes]) == 1
+        assert os.path.exists(os.path.join(path, 'ok.png'))
+        assert not os.path.exists(os.path.join(path, 'fails.png'))
+        os.remove(os.path.join(path, 'ok.png'))
+
+
+def test_cli_restyle(*args, **kwargs):
+    ''' Pickled figures are restyled, and failures set the exit code '''
+
+    path = tempfile.mkdtemp()
+    fig = plt.figure()
+    plt.plot([0, 1])
+    good = os.path.join(path, 'fig.pkl')
+    with open(good, 'wb') as f:
+        pickle.dump(fig, f)
+    plt.close(fig)
+    bad = os.path.join(path, 'bad.pkl')
+    with open(bad, 'wb') as f:
+        f.write(b'not a pickle')
+    out_dir = os.path.join(path, 'out')
+
+    assert main(['restyle', good, '-s', 'article_s', '-f', 'png', '-o', out_dir, '-j', '1']) == 0
+    assert os.path.exists(os.path.join(out_dir, 'fig.png'))
+    assert main(['restyle', good, bad, '-f', 'png', '-o', out_dir, '-j', '2']) == 1
+
+
+if __name__ == '__main__':
+
+    test_cli()
+    test_cli_exit()
+    test_cli_restyle()
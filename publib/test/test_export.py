@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+from PIL import Image
+
+from publib import set_style
+from publib.tools.export import save_tiled
+
+
+def test_save_tiled(*args, **kwargs):
+    ''' Images rendered in strips match the image rendered at once '''
+
+    set_style('poster', **{'savefig.bbox': 'standard'})
+
+    fig = plt.figure()
+    plt.plot(np.sin(np.linspace(0, 10, 100)))
+    plt.xlabel('x')
+
+    path = tempfile.mkdtemp()
+    ref = os.path.join(path, 'ref.png')
+    fig.savefig(ref, dpi=50)
+    ref = np.asarray(Image.open(ref).convert('RGBA')).astype(int)
+
+    for ext in ['png', 'tif']:
+        out = os.path.join(path, 'tiled.' + ext)
+        save_tiled(fig, out, dpi=50, tile_height=64)
+        img = np.asarray(Image.open(out)).astype(int)
+        assert img.shape == ref.shape
+        # only antialiasing at strip edges may differ
+        assert (img != ref).any(axis=-1).mean() < 0.01
+
+    plt.close('all')
+    mpl.rcParams['savefig.bbox'] = 'tight'
+
+
+def test_save_tiled_size(*args, **kwargs):
+    ''' Same image size as savefig when dpi * size is not an integer '''
+
+    set_style('poster', **{'savefig.bbox': 'standard'})
+
+    fig = plt.figure(figsize=(6.4, 4.8))
+    plt.plot(np.sin(np.linspace(0, 10, 100)))
+
+    path = tempfile.mkdtemp()
+    for dpi in [101, 133.3]:
+        ref = os.path.join(path, 'ref.png')
+        fig.savefig(ref, dpi=dpi)
+        ref = np.asarray(Image.open(ref).convert('RGBA')).astype(int)
+        out = os.path.join(path, 'tiled.png')
+        save_tiled(fig, out, dpi=dpi, tile_height=37)
+        img = np.asarray(Image.open(out)).astype(int)
+        assert img.shape == ref.shape
+        assert (img != ref).any(axis=-1).mean() < 0.01
+
+    plt.close('all')
+    mpl.rcParams['savefig.bbox'] = 'tight'
+
+
+if __name__ == '__main__':
+
+    test_save_tiled()
+    test_save_tiled_size()
@@ -11,7 +11,7 @@ Created on Sun Apr  8 18:26:37 2018
 
 from __future__ import absolute_import, print_function
 
-from publib import set_style, fix_style
+from publib import set_style, fix_style, available_styles, describe_style, register_style_dir
 from publib.tools.tools import reset_defaults, regenerate_fonts
 from publib.tools.fix import fix_bold_TimesNewRoman
 import matplotlib as mpl
@@ -153,10 +153,74 @@ def test_tools():
     
     fix_bold_TimesNewRoman()
 
+def test_styles():
+    ''' Test styles are listed and described from the style catalog '''
+
+    import os
+    import tempfile
+    import matplotlib.pyplot as plt
+
+    assert 'article' in available_styles()
+    assert describe_style('article')['requires'] == ['basic']
+    assert describe_style('basic')['requires'] == []
+    assert describe_style('article')['fix_params']['clean_spines'] == False
+    assert describe_style('basic')['fix_params']['clean_spines'] == True
+
+    # User styles
+    path = tempfile.mkdtemp()
+    with open(os.path.join(path, 'my_journal.mplstyle'), 'w') as f:
+        f.write('lines.linewidth: 7\n')
+    register_style_dir(path)
+
+    set_style(['article', 'my_journal'])
+    assert mpl.rcParams['lines.linewidth'] == 7
+    plt.figure()
+    fix_style(['article', 'my_journal'])
+    plt.close('all')
+
+def test_layout():
+    ''' Test layout targets the figure of the axe, and is not recomputed
+    if nothing changed '''
+
+    import matplotlib.pyplot as plt
+
+    set_style('article')
+
+    fig = plt.figure()
+    ax = fig.add_subplot()
+    ax.set_xlabel('x')
+    plt.figure()        # another current figure
+
+    calls = []
+    tight_layout = fig.tight_layout
+    fig.tight_layout = lambda *a, **k: calls.append(1) or tight_layout(*a, **k)
+    fix_style('article', ax)
+    fix_style('article', ax)
+    assert len(calls) == 1
+    ax.set_xlabel('new label')
+    fix_style('article', ax)
+    assert len(calls) == 2
+
+    # Figure texts and legends also change the layout
+    fig.suptitle('Title', fontsize=30)
+    fix_style('article', ax)
+    assert len(calls) == 3
+    ax.plot([0, 1], label='line')
+    ax.legend()
+    fix_style('article', ax)
+    assert len(calls) == 4
+
+    fix_style('article', ax, layout='constrained')
+    assert isinstance(fig.get_layout_engine(), mpl.layout_engine.ConstrainedLayoutEngine)
+
+    plt.close('all')
+
 def run_testcases():
     
     test_routines()
     test_tools()
+    test_styles()
+    test_layout()
 
 if __name__ == '__main__':
     run_testcases()
\ No newline at end of file
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+
+"""
+
+import numpy as np
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+
+from publib import set_style, fix_style
+from publib.tools.labels import label_points
+
+
+def test_label_points(*args, **kwargs):
+    ''' Sparse points are all labelled, dense ones are not, and labels
+    can still be draggable annotations '''
+
+    mpl.rcdefaults()
+    set_style('article')
+
+    plt.figure()
+    ax = plt.subplot()
+    x = np.array([0.1, 0.5, 0.9])
+    ax.plot(x, x, 'o')
+    ax.set_xlim((0, 1))
+    ax.set_ylim((0, 1))
+    labels = label_points(ax, x, x, ['a', 'b', 'c'])
+    assert len(labels.get_paths()) == 3
+    ann = label_points(ax, x, x, ['a', 'b', 'c'], as_text=True, avoid_points=False)
+    assert len(ann) == 3
+    fix_style('article', ax, draggable_text=True)
+
+    # blank labels are skipped, the others keep their points
+    labels = label_points(ax, x, x, ['', 'b', ' \n '])
+    assert len(labels.get_paths()) == 1
+    assert np.allclose(labels.get_offsets(), [[0.5, 0.5]])
+    assert len(label_points(ax, x, x, ['', 'b', ' '], as_text=True)) == 1
+
+    rng = np.random.RandomState(0)
+    plt.figure()
+    ax = plt.subplot()
+    x = rng.rand(300)
+    y = rng.rand(300)
+    ax.plot(x, y, 'o')
+    ax.set_xlim((-0.1, 1.1))
+    ax.set_ylim((-0.1, 1.1))
+    texts = ['p{0}'.format(i) for i in range(len(x))]
+    n = len(label_points(ax, x, y, texts).get_paths())
+    assert 0 < n < len(x)
+    # labels take some room from the points
+    assert n < len(label_points(ax, x, y, texts, avoid_points=False).get_paths())
+
+    plt.close('all')
+
+
+if __name__ == '__main__':
+
+    test_label_points()
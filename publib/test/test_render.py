@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+
+"""
+
+import asyncio
+import inspect
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+
+from publib.tools.render import render, Renderer
+
+
+def _plot_line():
+    ''' module-level so that it can be sent to workers '''
+    import matplotlib.pyplot as plt
+    plt.plot([0, 1], [0, 1])
+    plt.xlabel('x')
+
+
+def _plot_subplots():
+    fig, ax = plt.subplots()
+    ax.plot([0, 1], [0, 1])
+
+
+def _plot_in_basic():
+    assert mpl.rcParams['xtick.labelsize'] == 16     # 24 in poster
+    plt.plot([0, 1], [0, 1])
+
+
+def test_render(*args, **kwargs):
+    ''' Figures are returned as encoded bytes, synchronously and asynchronously '''
+
+    png = render(_plot_line, style='article', fmt='png')
+    assert png.startswith(b'\x89PNG')
+
+    async def run():
+        async with Renderer('article', processes=2, max_pending=2) as renderer:
+            return await asyncio.gather(*[renderer.render(_plot_line, fmt=fmt, timeout=60)
+                                          for fmt in ['png', 'svg', 'pdf']])
+
+    png, svg, pdf = asyncio.run(run())
+    assert png.startswith(b'\x89PNG')
+    assert b'<svg' in svg
+    assert pdf.startswith(b'%PDF')
+
+
+def test_render_closes_figures(*args, **kwargs):
+    ''' Figures created by plot_fn are closed, even if not returned '''
+
+    plt.close('all')
+    for i in range(3):
+        render(_plot_subplots, style='basic')
+    assert plt.get_fignums() == []
+
+
+def test_renderer_default_style(*args, **kwargs):
+    ''' Requests without a style use the style of the Renderer, even after a
+    request for another style in the same worker '''
+
+    async def run():
+        async with Renderer('basic', processes=1) as renderer:
+            await renderer.render(_plot_line, style='poster', timeout=60)
+            return await renderer.render(_plot_in_basic, timeout=60)
+
+    assert asyncio.run(run()).startswith(b'\x89PNG')
+
+
+def test_render_keeps_rcparams(*args, **kwargs):
+    ''' render() does not change the style of the calling process, and
+    styles do not add up across calls '''
+
+    mpl.rcdefaults()
+    before = dict(mpl.rcParams)
+    render(_plot_line, style='poster', fmt='png')
+    assert dict(mpl.rcParams) == before
+
+    render(_plot_in_basic, style='basic', fmt='png')
+    assert dict(mpl.rcParams) == before
+
+
+def test_render_module(*args, **kwargs):
+    ''' publib.tools.render is the module, not shadowed by the function '''
+
+    import publib.tools
+    assert inspect.ismodule(publib.tools.render)
+    assert publib.tools.render.Renderer is Renderer
+
+
+if __name__ == '__main__':
+
+    test_render()
+    test_render_closes_figures()
+    test_renderer_default_style()
+    test_render_keeps_rcparams()
+    test_render_module()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+
+"""
+
+import inspect
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy as np
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+
+from publib import set_style
+from publib.tools.restyle import restyle
+
+
+def test_restyle(*args, **kwargs):
+    ''' Pickled figures take the sizes of the new style '''
+
+    mpl.rcdefaults()
+    path = tempfile.mkdtemp()
+    paths = []
+    for i in range(3):
+        fig = plt.figure()
+        plt.plot(np.arange(10) * i, label='line')
+        plt.xlabel('x')
+        plt.legend()
+        paths.append(os.path.join(path, 'fig{0}.pickle'.format(i)))
+        with open(paths[-1], 'wb') as f:
+            pickle.dump(fig, f)
+        plt.close(fig)
+
+    # Re-exported as figures, in worker processes
+    outs = restyle(paths, style='article_s', processes=2, fmt='png', verbose=False)
+    assert outs == [p.replace('.pickle', '.png') for p in paths]
+    assert all(os.path.exists(o) for o in outs)
+
+    # Re-exported as pickles, in this process
+    out_dir = os.path.join(path, 'out')
+    outs = restyle(paths, style='article_s', processes=1, fmt='pkl', out_dir=out_dir)
+    with open(outs[0], 'rb') as f:
+        fig = pickle.load(f)
+    ax = fig.axes[0]
+    set_style('article_s')
+    assert ax.xaxis.label.get_size() == mpl.rcParams['axes.labelsize']
+    assert ax.lines[0].get_linewidth() == mpl.rcParams['lines.linewidth']
+    assert ax.get_legend().get_frame_on() == mpl.rcParams['legend.frameon']
+
+    # Inputs are not overwritten, and unreadable files do not stop the batch
+    try:
+        restyle(paths, style='article_s', processes=1, fmt='pickle')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('input files would be overwritten')
+    other = os.path.join(path, 'other')
+    os.makedirs(other)
+    shutil.copy(paths[0], other)
+    try:
+        restyle([paths[0], os.path.join(other, 'fig0.pickle')], processes=1,
+                fmt='png', out_dir=out_dir)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('outputs would overwrite each other')
+    bad = os.path.join(path, 'bad.pickle')
+    with open(bad, 'wb') as f:
+        f.write(b'not a pickle')
+    outs = restyle([bad] + paths, style='article_s', processes=2, fmt='png',
+                   verbose=False)
+    assert outs[0] is None
+    assert all(os.path.exists(o) for o in outs[1:])
+
+    plt.close('all')
+
+
+def test_restyle_module(*args, **kwargs):
+    ''' publib.tools.restyle is the module, not shadowed by the function '''
+
+    import publib.tools
+    assert inspect.ismodule(publib.tools.restyle)
+    assert publib.tools.restyle.restyle is restyle
+
+
+if __name__ == '__main__':
+
+    test_restyle()
+    test_restyle_module()
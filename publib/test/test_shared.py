@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+
+"""
+
+import numpy as np
+import matplotlib as mpl
+
+from publib.tools.shared import SharedArrays, attached, plot_in_workers
+
+
+def _plot_sum(data, job):
+    ''' module-level so that it can be sent to workers '''
+    import matplotlib.pyplot as plt
+    fig = plt.figure()
+    plt.plot(data['x'], data['y'] * job)
+    plt.close(fig)
+    return float(data['y'].sum() * job), mpl.rcParams['legend.frameon']
+
+
+def test_shared_arrays(*args, **kwargs):
+    ''' Arrays are read back identical, and released on exit '''
+
+    x = np.linspace(0, 1, 1000)
+
+    for backend in ['shm', 'memmap']:
+        with SharedArrays({'x': x}, backend=backend) as shared:
+            with attached(shared.handles) as data:
+                assert np.array_equal(data['x'], x)
+                assert not data['x'].flags.writeable
+        assert shared._segments == []
+
+
+def test_plot_in_workers(*args, **kwargs):
+    ''' Workers see the shared data and the publib style '''
+
+    x = np.linspace(0, 1, 100)
+    y = np.ones_like(x)
+
+    res = plot_in_workers(_plot_sum, {'x': x, 'y': y}, [1, 2, 3],
+                          style='article', processes=2)
+
+    assert [r[0] for r in res] == [100, 200, 300]
+    assert all(r[1] is False for r in res)   # article: legend.frameon: false
+
+
+if __name__ == '__main__':
+
+    test_shared_arrays()
+    test_plot_in_workers()
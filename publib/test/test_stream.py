@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from publib import set_style, fix_style
+from publib.tools.stream import plot_stream, _envelope
+
+
+def test_envelope(*args, **kwargs):
+    ''' Chunked envelope matches the envelope of the full array '''
+
+    y = np.random.normal(size=10001)
+    x = np.cumsum(np.random.rand(len(y)))
+    edges = np.linspace(x[0], x[-1], 51)
+    bins = np.clip(np.searchsorted(edges, x, side='right') - 1, 0, 49)
+
+    _, lo, hi = _envelope(y, x, 50, chunksize=777)
+    for b in range(50):
+        assert lo[b] == y[bins == b].min()
+        assert hi[b] == y[bins == b].max()
+
+
+def test_plot_stream(*args, **kwargs):
+    ''' Memory-mapped .npy files are plotted with one point per pixel edge '''
+
+    set_style('article')
+
+    path = os.path.join(tempfile.mkdtemp(), 'signal.npy')
+    np.save(path, np.sin(np.linspace(0, 100, 100000)))
+
+    plt.figure()
+    line, = plot_stream(path, chunksize=1000, npix=200)
+    fix_style('article')
+    assert len(line.get_xdata()) == 400
+    assert np.nanmax(line.get_ydata()) <= 1
+
+    plt.close('all')
+    del line
+    os.remove(path)
+
+
+def test_plot_stream_short(*args, **kwargs):
+    ''' Series with fewer samples than bins are still drawn as one line '''
+
+    y = np.sin(np.linspace(0, 10, 100))
+
+    plt.figure()
+    line, = plot_stream(y, npix=600)
+    assert len(line.get_xdata()) == 2 * len(y)
+    assert np.isfinite(line.get_ydata()).all()
+    assert np.ptp(line.get_ydata()) > 1
+
+    plt.close('all')
+
+
+if __name__ == '__main__':
+
+    test_envelope()
+    test_plot_stream()
+    test_plot_stream_short()
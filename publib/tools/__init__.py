@@ -5,4 +5,8 @@ publib
 
 from .tools import reset_defaults, regenerate_fonts, list_font_names, list_font_files
 from .fix import fix_bold_TimesNewRoman
-from .colors import colors, keep_color, get_next_color
\ No newline at end of file
+from .colors import colors, keep_color, get_next_color
+from .shared import SharedArrays, attached, plot_in_workers
+from .labels import label_points
+from .stream import plot_stream
+from .export import save_tiled
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Export figures at very high resolution with bounded memory
+
+Use::
+
+    set_style('poster')
+    ...
+    save_tiled(fig, 'poster.png', dpi=1200)
+
+The figure is rendered in horizontal strips, each streamed to the PNG or TIFF
+file as soon as it is rendered: peak memory is one strip, instead of the
+whole image. Each strip redraws the figure (clipped to the strip), so
+rendering takes longer than with ``savefig``.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import struct
+import zlib
+
+import numpy as np
+import matplotlib as mpl
+from matplotlib.transforms import Bbox
+
+
+def save_tiled(fig, path, dpi=None, tile_height=512, bbox_inches=None,
+               format=None):
+    ''' Save a figure as PNG or TIFF, rendering it one horizontal strip at a
+    time
+
+    Parameters
+    ----------
+    fig: a matplotlib Figure
+    path: str
+        output file
+    dpi: float
+        If None, use ``savefig.dpi`` of the current style
+    tile_height: int
+        height of the strips, in pixels. Peak memory is about
+        ``4 * tile_height * image width`` bytes.
+    bbox_inches: None, 'tight', 'standard', or Bbox
+        area of the figure to save, as in ``savefig``. If None, use
+        ``savefig.bbox`` of the current style.
+    format: 'png', 'tiff'
+        If None, guessed from the extension of ``path``
+
+    Examples
+    --------
+    >>> save_tiled(plt.gcf(), 'poster.tif', dpi=1200)
+
+    Notes
+    -----
+
+    Layout engines (``tight``, ``constrained``) and ``bbox_inches='tight'``
+    are computed once at the figure dpi, not at the export dpi: the result
+    may differ by a few pixels from ``savefig``.
+
+    '''
+
+    if format is None:
+        format = path.rsplit('.', 1)[-1].lower()
+    if format == 'tif':
+        format = 'tiff'
+    if format not in ['png', 'tiff']:
+        raise ValueError('format should be one of png, tiff. Got {0}'.format(format))
+
+    if dpi is None:
+        dpi = mpl.rcParams['savefig.dpi']
+    if dpi == 'figure':
+        dpi = fig.dpi
+    if bbox_inches is None:
+        bbox_inches = mpl.rcParams['savefig.bbox']
+
+    layout_engine = fig.get_layout_engine()
+    # Run the layout once, then freeze it: with a layout engine (or 'tight')
+    # savefig would allocate a renderer for the full image
+    fig.draw_without_rendering()
+    if bbox_inches == 'tight':
+        bbox_inches = fig.get_tightbbox().padded(mpl.rcParams['savefig.pad_inches'])
+    elif not bbox_inches or bbox_inches == 'standard':
+        bbox_inches = Bbox.from_bounds(0, 0, *fig.get_size_inches())
+
+    # Agg truncates the canvas size, and aligns the image on its bottom edge
+    width = int(bbox_inches.width * dpi)
+    height = int(bbox_inches.height * dpi)
+
+    with open(path, 'wb') as f:
+        writer = (_PNGWriter if format == 'png' else _TIFFWriter)(f, width, height, dpi,
+                                                                   tile_height)
+        with mpl.rc_context({'figure.autolayout': False,
+                             'figure.constrained_layout.use': False}):
+            fig.set_layout_engine(None)
+        try:
+            for top in range(0, height, tile_height):
+                rows = min(tile_height, height - top)
+                y0 = bbox_inches.y0 + (height - top - rows) / dpi
+                # half a pixel more, so that truncation cannot lose a row or
+                # a column; it is cut off as the top of a savefig image is
+                strip = Bbox([[bbox_inches.x0, y0],
+                              [bbox_inches.x0 + (width + 0.5) / dpi, y0 + (rows + 0.5) / dpi]])
+                writer.write(_render_strip(fig, strip, dpi, width, rows))
+        finally:
+            fig.set_layout_engine(layout_engine)
+        writer.close()
+
+
+def _render_strip(fig, bbox, dpi, width, rows):
+    ''' Render the area ``bbox`` (inches) of the figure as RGBA, shape (rows, width, 4) '''
+
+    buf = _RGBABuffer()
+    fig.savefig(buf, format='raw', dpi=dpi, bbox_inches=bbox)
+    img = buf.image[:rows, :width]
+    if img.shape[:2] != (rows, width):
+        out = np.zeros((rows, width, 4), dtype=np.uint8)
+        out[:img.shape[0], :img.shape[1]] = img
+        img = out
+    return img
+
+
+class _RGBABuffer(io.BytesIO):
+    ''' File-like object for ``savefig(format='raw')``, that keeps the shape of
+    the Agg canvas, (height, width, 4) '''
+
+    image = None
+
+    def write(self, data):
+        img = np.array(data, dtype=np.uint8)
+        if img.ndim != 3:
+            raise ValueError('Expected the Agg buffer as a (height, width, 4) array. '
+                             'Got shape {0}'.format(img.shape))
+        self.image = img
+        return img.nbytes
+
+
+class _PNGWriter(object):
+    ''' Minimal streaming PNG encoder (8-bit RGBA) '''
+
+    def __init__(self, f, width, height, dpi, tile_height):
+        self.f = f
+        self.z = zlib.compressobj()
+        f.write(b'\x89PNG\r\n\x1a\n')
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+        ppm = int(round(dpi / 0.0254))
+        self._chunk(b'pHYs', struct.pack('>IIB', ppm, ppm, 1))
+
+    def _chunk(self, tag, data):
+        self.f.write(struct.pack('>I', len(data)) + tag + data)
+        self.f.write(struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+    def write(self, img):
+        # filter type 0 (None) at the start of each row
+        rows = np.concatenate((np.zeros((img.shape[0], 1), dtype=np.uint8),
+                               img.reshape(img.shape[0], -1)), axis=1)
+        data = self.z.compress(rows.tobytes())
+        if data:
+            self._chunk(b'IDAT', data)
+
+    def close(self):
+        self._chunk(b'IDAT', self.z.flush())
+        self._chunk(b'IEND', b'')
+
+
+class _TIFFWriter(object):
+    ''' Minimal streaming TIFF encoder (8-bit RGBA, one deflate-compressed
+    strip per tile). The image directory is written at the end of the file '''
+
+    def __init__(self, f, width, height, dpi, tile_height):
+        self.f = f
+        self.width = width
+        self.height = height
+        self.dpi = dpi
+        self.tile_height = tile_height
+        self.offsets = []
+        self.counts = []
+        f.write(b'II*\x00' + struct.pack('<I', 0))     # IFD offset, set on close
+
+    def write(self, img):
+        data = zlib.compress(np.ascontiguousarray(img).tobytes())
+        self.offsets.append(self.f.tell())
+        self.counts.append(len(data))
+        self.f.write(data)
+
+    def close(self):
+        f = self.f
+
+        # Out-of-line values
+        def extra(data):
+            if f.tell() % 2:
+                f.write(b'\x00')
+            pos = f.tell()
+            f.write(data)
+            return pos
+        n = len(self.offsets)
+        bits = extra(struct.pack('<4H', 8, 8, 8, 8))
+        offsets = extra(struct.pack('<{0}I'.format(n), *self.offsets))
+        counts = extra(struct.pack('<{0}I'.format(n), *self.counts))
+        res = extra(struct.pack('<II', int(round(self.dpi * 100)), 100))
+
+        SHORT, LONG, RATIONAL = 3, 4, 5
+        tags = [(256, LONG, 1, self.width),           # ImageWidth
+                (257, LONG, 1, self.height),          # ImageLength
+                (258, SHORT, 4, bits),                # BitsPerSample
+                (259, SHORT, 1, 8),                   # Compression: deflate
+                (262, SHORT, 1, 2),                   # Photometric: RGB
+                (273, LONG, n, offsets),              # StripOffsets
+                (277, SHORT, 1, 4),                   # SamplesPerPixel
+                (278, LONG, 1, self.tile_height),     # RowsPerStrip
+                (279, LONG, n, counts),               # StripByteCounts
+                (282, RATIONAL, 1, res),              # XResolution
+                (283, RATIONAL, 1, res),              # YResolution
+                (296, SHORT, 1, 2),                   # ResolutionUnit: inch
+                (338, SHORT, 1, 2),                   # ExtraSamples: alpha
+                ]
+        if n == 1:
+            # a single value fits in the entry itself
+            tags[5] = (273, LONG, 1, self.offsets[0])
+            tags[8] = (279, LONG, 1, self.counts[0])
+
+        if f.tell() % 2:
+            f.write(b'\x00')
+        ifd = f.tell()
+        f.write(struct.pack('<H', len(tags)))
+        for tag, typ, count, value in tags:
+            if typ == SHORT and count == 1:
+                f.write(struct.pack('<HHIHH', tag, typ, count, value, 0))
+            else:
+                f.write(struct.pack('<HHII', tag, typ, count, value))
+        f.write(struct.pack('<I', 0))
+        f.seek(4)
+        f.write(struct.pack('<I', ifd))
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Place many point labels at once, without overlaps
+
+Use::
+
+    plt.plot(x, y, 'o')
+    label_points(plt.gca(), x, y, names)
+    fix_style()
+
+Label sizes are estimated from the font size instead of being measured by the
+renderer, and collisions are detected with a uniform grid over the labels
+already placed, so that thousands of labels are laid out in a single pass.
+Labels are then drawn as a single collection of glyph outlines, rather than
+one Text artist each.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+import matplotlib as mpl
+
+# Candidate positions around a point, in order of preference: (dx, dy) signs
+_CANDIDATES = np.array([(1, 1), (-1, 1), (1, -1), (-1, -1),
+                        (1, 0), (-1, 0), (0, 1), (0, -1)])
+
+_HA = {1: 'left', -1: 'right', 0: 'center'}
+_VA = {1: 'bottom', -1: 'top', 0: 'center'}
+
+# Average character width and line height, in font size units
+_CHAR_WIDTH = 0.6
+_LINE_HEIGHT = 1.2
+
+
+def label_points(ax, x, y, texts, fontsize=None, offset=4, avoid_points=True,
+                 as_text=False, **kwargs):
+    ''' Label points ``(x, y)`` with ``texts``, at positions where labels do
+    not overlap each other (nor the points, nor the axe border). Labels that
+    cannot be placed are dropped.
+
+    Call it after the data is plotted and the axe limits are set: positions
+    are computed for the current limits and figure size.
+
+    Parameters
+    ----------
+    ax: a matplotlib axe
+    x, y: arrays
+        point coordinates, in data units
+    texts: list of str
+        labels. Blank labels are skipped.
+    fontsize: float or str
+        If None, use ``xtick.labelsize`` of the current style.
+    offset: float
+        distance between a point and its label, in points
+    avoid_points: bool
+        if True, labels do not cover any of the labelled points
+    as_text: bool
+        if False, all labels are drawn as glyph outlines in a single
+        PathCollection: fast to create and draw, even for thousands of labels.
+        If True, each label is an Annotation, which can be edited or made
+        draggable (see ``draggable_text`` in :func:`~publib.main.fix_style`).
+    kwargs: dict
+        forwarded to ``PathCollection`` (or ``ax.annotate`` if ``as_text``)
+
+    Returns
+    -------
+    the PathCollection, or the list of Annotations (one per placed label) if
+    ``as_text``
+
+    Examples
+    --------
+    >>> plt.plot(x, y, 'o')
+    >>> label_points(plt.gca(), x, y, ['P{0}'.format(i) for i in range(len(x))])
+
+    '''
+
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    texts = list(texts)
+    if not (len(x) == len(y) == len(texts)):
+        raise ValueError('x, y and texts should have the same length. Got {0}, {1}, {2}'.format(
+            len(x), len(y), len(texts)))
+
+    if fontsize is None:
+        fontsize = mpl.rcParams['xtick.labelsize']
+    size = mpl.font_manager.FontProperties(size=fontsize).get_size_in_points()
+    px_per_pt = ax.figure.dpi / 72
+
+    # Label boxes (display units)
+    xy = ax.transData.transform(np.column_stack((x, y)))
+    lines = [t.split('\n') for t in texts]
+    w = np.array([max(len(l) for l in ls) for ls in lines]) * _CHAR_WIDTH * size * px_per_pt
+    h = np.array([len(ls) for ls in lines]) * _LINE_HEIGHT * size * px_per_pt
+    off = offset * px_per_pt
+
+    # Lower-left corner of every candidate box, shape (n, len(_CANDIDATES))
+    dx = _CANDIDATES[:, 0][None, :]
+    dy = _CANDIDATES[:, 1][None, :]
+    x0 = xy[:, :1] + np.where(dx > 0, off, np.where(dx < 0, -w[:, None] - off, -w[:, None] / 2))
+    y0 = xy[:, 1:] + np.where(dy > 0, off, np.where(dy < 0, -h[:, None] - off, -h[:, None] / 2))
+    x1 = x0 + w[:, None]
+    y1 = y0 + h[:, None]
+
+    bbox = ax.bbox
+    valid = (x0 >= bbox.x0) & (x1 <= bbox.x1) & (y0 >= bbox.y0) & (y1 <= bbox.y1)
+    valid &= np.isfinite(x0) & np.isfinite(y0)
+
+    grid = _Grid(max(w.max(initial=1), h.max(initial=1)))
+    if avoid_points:
+        r = mpl.rcParams['lines.markersize'] / 2 * px_per_pt
+        for px, py in xy[np.isfinite(xy).all(axis=1)]:
+            grid.add(px - r, py - r, px + r, py + r)
+
+    placed = []     # (label index, candidate signs)
+    for i in range(len(texts)):
+        if not texts[i].strip():
+            continue        # blank labels take no room, and draw nothing
+        for j in np.flatnonzero(valid[i]):
+            box = (x0[i, j], y0[i, j], x1[i, j], y1[i, j])
+            if not grid.collides(*box):
+                grid.add(*box)
+                placed.append((i, _CANDIDATES[j]))
+                break
+
+    if as_text:
+        return [ax.annotate(texts[i], (x[i], y[i]), xytext=(sx * offset, sy * offset),
+                            textcoords='offset points', ha=_HA[sx], va=_VA[sy],
+                            fontsize=fontsize, **kwargs)
+                for i, (sx, sy) in placed]
+
+    return _add_label_collection(ax, x, y, texts, placed, size, offset, **kwargs)
+
+
+def _add_label_collection(ax, x, y, texts, placed, size, offset, **kwargs):
+    ''' All labels as glyph outlines in a single PathCollection, offset from
+    their point in points, so that they follow zoom and figure resizes '''
+    from matplotlib.collections import PathCollection
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.path import Path
+    from matplotlib.text import TextPath
+    from matplotlib.transforms import Affine2D
+
+    # resolve the font file once, instead of once per label
+    prop = FontProperties(size=size)
+    prop = FontProperties(fname=mpl.font_manager.findfont(prop), size=size)
+    paths = []
+    idx = []
+    for i, (sx, sy) in placed:
+        lines = texts[i].split('\n')
+        # TextPath fails on text without glyphs
+        lines = [TextPath((0, -k * _LINE_HEIGHT * size), line, prop=prop)
+                 for k, line in enumerate(lines) if line.strip()]
+        if not lines:
+            continue
+        path = Path.make_compound_path(*lines)
+        if not len(path.vertices):
+            continue
+        # control points bound the glyphs: much faster than exact extents
+        (ex0, ey0), (ex1, ey1) = path.vertices.min(axis=0), path.vertices.max(axis=0)
+        # same alignment as ha/va of a Text, relative to the point
+        dx = {1: offset - ex0, -1: -offset - ex1, 0: -(ex0 + ex1) / 2}[sx]
+        dy = {1: offset - ey0, -1: -offset - ey1, 0: -(ey0 + ey1) / 2}[sy]
+        paths.append(path.transformed(Affine2D().translate(dx, dy)))
+        idx.append(i)
+
+    kwargs.setdefault('facecolors', mpl.rcParams['text.color'])
+    kwargs.setdefault('edgecolors', 'none')
+    kwargs.setdefault('zorder', 3)
+    collection = PathCollection(paths, offsets=np.column_stack((x[idx], y[idx])),
+                                offset_transform=ax.transData,
+                                transform=Affine2D().scale(1 / 72) + ax.figure.dpi_scale_trans,
+                                **kwargs)
+    # labels do not change the data limits
+    ax.add_collection(collection, autolim=False)
+
+    return collection
+
+
+class _Grid(object):
+    ''' Uniform grid of boxes for collision tests. With a cell at least as
+    large as any box, a box spans at most 2x2 cells '''
+
+    def __init__(self, cell):
+        self.cell = float(cell)
+        self.cells = {}
+
+    def _keys(self, x0, y0, x1, y1):
+        c = self.cell
+        for i in range(int(x0 // c), int(x1 // c) + 1):
+            for j in range(int(y0 // c), int(y1 // c) + 1):
+                yield (i, j)
+
+    def add(self, x0, y0, x1, y1):
+        box = (x0, y0, x1, y1)
+        for k in self._keys(*box):
+            self.cells.setdefault(k, []).append(box)
+
+    def collides(self, x0, y0, x1, y1):
+        for k in self._keys(x0, y0, x1, y1):
+            for bx0, by0, bx1, by1 in self.cells.get(k, ()):
+                if x0 < bx1 and bx0 < x1 and y0 < by1 and by0 < y1:
+                    return True
+        return False
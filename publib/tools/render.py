@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Render publib-styled figures to encoded bytes, without blocking an asyncio
+event loop
+
+Use::
+
+    png = await arender(plot_fn, style='article', fmt='png')
+
+``set_style``, ``fix_style`` and ``savefig`` run in a bounded pool of worker
+processes where the style is already applied. The figure is written to an
+in-memory buffer, and its bytes are returned.
+
+For control over the pool size, backpressure and default timeout, create a
+:class:`~publib.tools.render.Renderer`::
+
+    async with Renderer('article', processes=4, max_pending=16) as renderer:
+        png = await renderer.render(plot_fn, timeout=5)
+
+Requires Python >= 3.7
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+
+
+def render(plot_fn, style='basic', fmt='png', fix=True, **kwargs):
+    ''' Plot with ``plot_fn`` in the publib ``style`` and return the encoded
+    figure as bytes. Runs synchronously in the current process, whose
+    rcParams are left unchanged.
+
+    Parameters
+    ----------
+    plot_fn: function
+        called without arguments. Plots in a new current figure, and may
+        return the figure to save. If it returns None, the current figure
+        is saved.
+    style: str or list of str
+        publib style, applied from Matplotlib defaults. See
+        :func:`~publib.main.set_style`. If None, the current rcParams are used.
+    fmt: str
+        output format: ``'png'``, ``'pdf'``, ``'svg'``, etc.
+    fix: bool
+        if True, call :func:`~publib.main.fix_style` on every axe of the
+        figure before saving.
+    kwargs: dict
+        forwarded to ``savefig``
+
+    Returns
+    -------
+    bytes
+
+    See Also
+    --------
+
+    :func:`~publib.tools.render.arender`
+
+    '''
+    import matplotlib as mpl
+    from publib.main import set_style
+
+    # the style of the current process is restored afterwards
+    with mpl.rc_context():
+        if style is not None:
+            # styles add up on top of each other: start again from scratch
+            mpl.rcdefaults()
+            set_style(style)
+        return _plot_and_save(plot_fn, style if fix else None, fmt, kwargs)
+
+
+def _plot_and_save(plot_fn, fix, fmt, kwargs):
+    ''' Plot, apply fix_style with style ``fix`` (unless None), and save
+    to an in-memory buffer '''
+    import matplotlib.pyplot as plt
+    from publib.main import fix_style
+
+    # Close every figure opened here, including the ones plot_fn creates
+    before = set(plt.get_fignums())
+    plt.figure()
+    fig = None
+    try:
+        fig = plot_fn()
+        if fig is None:
+            fig = plt.gcf()
+        if fix is not None:
+            for ax in fig.axes:
+                fix_style(fix, ax)
+        buf = io.BytesIO()
+        fig.savefig(buf, format=fmt, **kwargs)
+        return buf.getvalue()
+    finally:
+        for n in set(plt.get_fignums()) - before:
+            plt.close(n)
+        if fig is not None:
+            plt.close(fig)
+
+
+# %% Workers
+
+_worker_style = None
+
+
+def _init_worker(style, backend):
+    global _worker_style
+    import matplotlib
+    matplotlib.use(backend)
+    from publib.main import set_style
+    set_style(style)
+    _worker_style = style
+
+
+def _render_in_worker(plot_fn, style, fmt, fix, kwargs):
+    global _worker_style
+    import matplotlib as mpl
+    from publib.main import set_style
+
+    if style is None:
+        style = _worker_style
+    elif style != _worker_style:
+        # styles add up on top of each other: start again from scratch
+        mpl.rcdefaults()
+        set_style(style)
+        _worker_style = style
+
+    return _plot_and_save(plot_fn, style if fix else None, fmt, kwargs)
+
+
+class Renderer(object):
+    ''' A bounded pool of worker processes where the publib style is applied
+    once, when they start.
+
+    Parameters
+    ----------
+    style: str or list of str
+        default publib style. Requests for another style are supported, but
+        re-apply the style in the worker.
+    processes: int
+        number of workers. If None, use the number of CPUs.
+    max_pending: int
+        maximum number of requests submitted to the pool at once. Further
+        calls to :meth:`~publib.tools.render.Renderer.render` wait for a
+        free slot (backpressure). If None, twice the number of workers.
+    timeout: float
+        default timeout per request, in seconds. None for no timeout.
+    mpl_backend: str
+        Matplotlib backend used in workers
+
+    Notes
+    -----
+
+    ``plot_fn`` must be picklable (defined at module level).
+
+    On cancellation or timeout, a request that has not started is dropped.
+    A request already running in a worker cannot be interrupted: it keeps
+    its slot until it finishes, so that ``max_pending`` stays a real bound.
+
+    '''
+
+    def __init__(self, style='basic', processes=None, max_pending=None,
+                 timeout=None, mpl_backend='Agg'):
+        from concurrent.futures import ProcessPoolExecutor
+        import os
+
+        if processes is None:
+            processes = os.cpu_count() or 1
+        if max_pending is None:
+            max_pending = 2 * processes
+
+        self.style = style
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self._pool = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                         initargs=(style, mpl_backend))
+        self._slots = None
+        self._loop = None
+
+    def _get_slots(self, loop):
+        # asyncio primitives are bound to one event loop
+        if self._loop is not loop:
+            import asyncio
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._loop = loop
+        return self._slots
+
+    async def render(self, plot_fn, style=None, fmt='png', fix=True,
+                     timeout=-1, **kwargs):
+        ''' Render in a worker and return the encoded figure as bytes.
+
+        Parameters
+        ----------
+        plot_fn, fmt, fix, kwargs:
+            see :func:`~publib.tools.render.render`
+        style: str or list of str
+            if None, use the style of the Renderer
+        timeout: float
+            in seconds. If -1, use the timeout of the Renderer. Raises
+            ``asyncio.TimeoutError`` when exceeded.
+
+        '''
+        import asyncio
+
+        if timeout == -1:
+            timeout = self.timeout
+        if style is None:
+            style = self.style
+
+        loop = asyncio.get_running_loop()
+        slots = self._get_slots(loop)
+
+        await slots.acquire()
+        try:
+            cf = self._pool.submit(_render_in_worker, plot_fn, style, fmt, fix, kwargs)
+        except:
+            slots.release()
+            raise
+        # Release the slot only once the worker is done with the request
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(slots.release)
+            except RuntimeError:    # event loop already closed
+                pass
+        cf.add_done_callback(release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(cf), timeout)
+        except BaseException:
+            cf.cancel()
+            raise
+
+    def close(self, wait=True):
+        ''' Shut the workers down '''
+        self._pool.shutdown(wait=wait)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_renderer = None
+
+
+async def arender(plot_fn, style='basic', fmt='png', fix=True, timeout=None,
+                  **kwargs):
+    ''' Asynchronous version of :func:`~publib.tools.render.render`.
+
+    Runs in a default :class:`~publib.tools.render.Renderer`, created on first
+    call with one worker per CPU.
+
+    Examples
+    --------
+    >>> png = await publib.arender(plot_fn, style='article', fmt='png', timeout=5)
+
+    '''
+    global _default_renderer
+
+    if _default_renderer is None:
+        _default_renderer = Renderer(style)
+
+    return await _default_renderer.render(plot_fn, style=style, fmt=fmt, fix=fix,
+                                          timeout=timeout, **kwargs)
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+Restyle existing figures without re-running the scripts that made them
+
+Use::
+
+    restyle(glob('figures/*.pkl'), style='article_s', processes=8)
+
+rcParams are read when artists are created, so changing the style does not
+change figures that already exist. :func:`~publib.tools.restyle.restyle_figure`
+copies the relevant rcParams of the current style to the artists of a figure,
+then calls :func:`~publib.main.fix_style` on every axe.
+
+.. warning::
+    only load pickled figures that you trust: unpickling can run arbitrary code
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import pickle
+import sys
+import time
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+from matplotlib.font_manager import FontProperties
+
+
+def restyle_figure(fig, style='basic'):
+    ''' Apply the current rcParams to the existing artists of ``fig``, then
+    :func:`~publib.main.fix_style` with ``style`` on each axe. Call
+    :func:`~publib.main.set_style` with the same style first.
+
+    Fonts, line and marker sizes, ticks, grid, spines, legend frame, figure
+    size and subplot margins are updated. Colors already used by lines are
+    kept.
+
+    Examples
+    --------
+    >>> set_style('article_s')
+    >>> restyle_figure(fig, 'article_s')
+
+    '''
+    from publib.main import fix_style
+
+    rc = mpl.rcParams
+
+    fig.set_size_inches(rc['figure.figsize'])
+    fig.set_facecolor(rc['figure.facecolor'])
+    fig.subplots_adjust(**{k: rc['figure.subplot.' + k]
+                           for k in ['left', 'right', 'bottom', 'top', 'wspace', 'hspace']})
+
+    for t in fig.texts:
+        _set_font(t, rc['font.size'])
+
+    for ax in fig.axes:
+        _set_font(ax.xaxis.label, rc['axes.labelsize'])
+        _set_font(ax.yaxis.label, rc['axes.labelsize'])
+        _set_font(ax.title, rc['axes.titlesize'])
+        for t in ax.texts:
+            _set_font(t, rc['font.size'])
+
+        for axis in 'xy':
+            for which in ['major', 'minor']:
+                ax.tick_params(axis=axis, which=which,
+                               direction=rc['{0}tick.direction'.format(axis)],
+                               length=rc['{0}tick.{1}.size'.format(axis, which)],
+                               width=rc['{0}tick.{1}.width'.format(axis, which)],
+                               pad=rc['{0}tick.{1}.pad'.format(axis, which)],
+                               labelsize=_size(rc['{0}tick.labelsize'.format(axis)]))
+            for t in getattr(ax, 'get_{0}ticklabels'.format(axis))(which='both'):
+                t.set_family(rc['font.family'])
+
+        for spine in ax.spines.values():
+            spine.set_linewidth(rc['axes.linewidth'])
+
+        ax.grid(False)
+        if rc['axes.grid']:
+            ax.grid(True, which=rc['axes.grid.which'], axis=rc['axes.grid.axis'],
+                    color=rc['grid.color'], alpha=rc['grid.alpha'],
+                    linestyle=rc['grid.linestyle'], linewidth=rc['grid.linewidth'])
+
+        for l in ax.lines:
+            l.set_linewidth(rc['lines.linewidth'])
+            l.set_markersize(rc['lines.markersize'])
+            l.set_markeredgewidth(rc['lines.markeredgewidth'])
+
+        leg = ax.get_legend()
+        if leg is not None:
+            leg.set_frame_on(rc['legend.frameon'])
+            for t in leg.get_texts():
+                _set_font(t, rc['legend.fontsize'])
+
+        fix_style(style, ax)
+
+
+def _size(size):
+    ''' Font size in points, from the current rcParams '''
+    return FontProperties(size=size).get_size_in_points()
+
+
+def _set_font(text, size):
+    text.set_family(mpl.rcParams['font.family'])
+    text.set_size(_size(size))
+
+
+# %% Batch
+
+def _init_worker(style, backend):
+    import matplotlib
+    matplotlib.use(backend)
+    from publib.main import set_style
+    matplotlib.rcdefaults()
+    set_style(style)
+
+
+def _get_output(path, fmt, out_dir):
+    if out_dir is None:
+        out_dir = os.path.dirname(path)
+    return os.path.join(out_dir, '{0}.{1}'.format(
+        os.path.splitext(os.path.basename(path))[0], fmt))
+
+
+def _restyle_file(path, style, fmt, out):
+    ''' Returns path, output file, time (s), error message or None '''
+    t0 = time.time()
+
+    try:
+        with open(path, 'rb') as f:
+            fig = pickle.load(f)
+        try:
+            restyle_figure(fig, style)
+            if fmt in ['pkl', 'pickle']:
+                with open(out, 'wb') as f:
+                    pickle.dump(fig, f)
+            else:
+                fig.savefig(out, format=fmt)
+        finally:
+            plt.close(fig)
+    except Exception as err:
+        return path, None, time.time() - t0, '{0}: {1}'.format(type(err).__name__, err)
+
+    return path, out, time.time() - t0, None
+
+
+def restyle(paths, style='basic', processes=None, fmt=None, out_dir=None,
+            verbose=True, mpl_backend='Agg'):
+    ''' Restyle pickled figures in parallel and export them
+
+    Parameters
+    ----------
+    paths: list of str
+        pickled Matplotlib figures
+    style: str or list of str
+        publib style. See :func:`~publib.main.set_style`
+    processes: int
+        number of worker processes. If None, use the number of CPUs. If 1,
+        run in the current process (and change its style).
+    fmt: str
+        output format: any ``savefig`` format, or ``'pkl'`` to pickle the
+        restyled figure again. If None, ``savefig.format`` of the style.
+    out_dir: str
+        output directory. If None, next to each input file. Output files have
+        the name of the input file, with the extension of ``fmt``. Input files
+        are never overwritten, nor two inputs saved to the same file: a
+        ValueError is raised before anything runs.
+    verbose: bool
+        print progress and throughput as figures are done
+
+    Returns
+    -------
+    list of output files, in the order of ``paths``. None for files that
+    failed: errors are reported, and do not stop the batch.
+
+    See Also
+    --------
+
+    :func:`~publib.tools.restyle.restyle_figure`
+
+    '''
+    from publib.main import _get_savefig_format
+
+    paths = list(paths)
+    if fmt is None:
+        fmt = _get_savefig_format(style)
+    if out_dir is not None and not os.path.exists(out_dir):
+        os.makedirs(out_dir)
+
+    targets = [_get_output(p, fmt, out_dir) for p in paths]
+    sources = {}
+    for p, out in zip(paths, targets):
+        if os.path.abspath(p) == os.path.abspath(out):
+            raise ValueError('Restyling {0} would overwrite it. '.format(p) +
+                             'Use another out_dir or fmt')
+        if os.path.abspath(out) in sources:
+            raise ValueError('{0} and {1} would both be restyled to {2}. '.format(
+                sources[os.path.abspath(out)], p, out) + 'Restyle them separately')
+        sources[os.path.abspath(out)] = p
+
+    outs = {}
+    t0 = time.time()
+
+    def progress(path, out, dt, error):
+        outs[path] = out
+        if not verbose:
+            return
+        if error is not None:
+            print('FAILED {0}: {1}'.format(path, error), file=sys.stderr)
+        else:
+            n = len(outs)
+            elapsed = time.time() - t0
+            print('{0}/{1} restyled ({2:.1f} fig/s, {3:.0f} ms/fig): {4}'.format(
+                n, len(paths), n / elapsed, dt * 1e3, out))
+
+    if processes == 1:
+        _init_worker(style, mpl.get_backend())
+        for p, out in zip(paths, targets):
+            progress(*_restyle_file(p, style, fmt, out))
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(style, mpl_backend)) as pool:
+            futures = [pool.submit(_restyle_file, p, style, fmt, out)
+                       for p, out in zip(paths, targets)]
+            for f in as_completed(futures):
+                progress(*f.result())
+
+    if verbose and paths:
+        elapsed = time.time() - t0
+        ok = sum(out is not None for out in outs.values())
+        print('Restyled {0}/{1} figures in {2:.1f}s ({3:.1f} fig/s)'.format(
+            ok, len(paths), elapsed, ok / elapsed))
+
+    return [outs[p] for p in paths]
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Hand large NumPy arrays over to plotting worker processes without copying them
+
+Arrays are placed once in shared memory (``multiprocessing.shared_memory``) or
+in memory-mapped ``.npy`` files. Workers only receive small picklable handles,
+attach to the data zero-copy, and plot with the publib style already applied.
+
+Use::
+
+    with SharedArrays({'x': x, 'y': y}) as shared:
+        ...                       # send shared.handles to workers
+
+or directly::
+
+    plot_in_workers(plot_fn, {'x': x, 'y': y}, jobs, style='article')
+
+The parent process owns the data: it is always released when the
+:class:`~publib.tools.shared.SharedArrays` context exits, even if a worker
+crashed.
+
+Requires Python >= 3.8 for the ``'shm'`` backend.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import sys
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class SharedArrays(object):
+    ''' Place a dict of NumPy arrays in shared memory or memory-mapped files
+
+    Parameters
+    ----------
+    arrays: dict of numpy arrays
+        arrays to share, indexed by name
+    backend: ``'shm'``, ``'memmap'``
+        ``'shm'`` uses ``multiprocessing.shared_memory``. ``'memmap'`` writes
+        ``.npy`` files in ``tmpdir`` and workers memory-map them read-only.
+    tmpdir: str
+        directory for the ``'memmap'`` backend. If None, a temporary directory
+        is created and removed on release.
+
+    Examples
+    --------
+    >>> with SharedArrays({'x': x}) as shared:
+    ...     with attached(shared.handles) as data:
+    ...         plt.plot(data['x'])
+
+    See Also
+    --------
+
+    :func:`~publib.tools.shared.attached`,
+    :func:`~publib.tools.shared.plot_in_workers`
+
+    '''
+
+    def __init__(self, arrays, backend='shm', tmpdir=None):
+
+        if backend not in ['shm', 'memmap']:
+            raise ValueError('backend should be one of shm, memmap. Got {0}'.format(backend))
+
+        self.backend = backend
+        self.handles = {}
+        self._segments = []
+        self._tmpdir = None
+        self._own_tmpdir = False
+
+        try:
+            if backend == 'shm':
+                self._share_shm(arrays)
+            else:
+                if tmpdir is None:
+                    tmpdir = tempfile.mkdtemp(prefix='publib_')
+                    self._own_tmpdir = True
+                self._tmpdir = tmpdir
+                self._share_memmap(arrays)
+        except:
+            self.release()
+            raise
+
+    def _share_shm(self, arrays):
+        from multiprocessing import shared_memory
+
+        for name, a in arrays.items():
+            a = np.ascontiguousarray(a)
+            # SharedMemory does not accept size 0
+            shm = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+            self._segments.append(shm)
+            np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf)[...] = a
+            self.handles[name] = ('shm', shm.name, a.shape, a.dtype.str)
+
+    def _share_memmap(self, arrays):
+
+        for i, (name, a) in enumerate(arrays.items()):
+            path = os.path.join(self._tmpdir, 'array{0}.npy'.format(i))
+            self._segments.append(path)
+            np.save(path, np.asarray(a))
+            self.handles[name] = ('memmap', path, None, None)
+
+    def release(self):
+        ''' Free all shared data. Safe to call several times '''
+
+        while self._segments:
+            seg = self._segments.pop()
+            if self.backend == 'shm':
+                seg.close()
+                try:
+                    seg.unlink()
+                except FileNotFoundError:
+                    pass
+            else:
+                try:
+                    os.remove(seg)
+                except OSError:
+                    pass
+        if self._own_tmpdir and self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def __del__(self):
+        try:
+            self.release()
+        except Exception:
+            pass
+
+
+@contextmanager
+def attached(handles):
+    ''' Attach to arrays shared by :class:`~publib.tools.shared.SharedArrays`
+    from any process. Yields a dict of zero-copy, read-only arrays. Do not
+    keep references to them after the context exits.
+    '''
+
+    opened = []
+    data = {}
+    try:
+        for name, (backend, ref, shape, dtype) in handles.items():
+            if backend == 'shm':
+                shm = _open_shm(ref)
+                opened.append(shm)
+                a = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+            else:
+                a = np.load(ref, mmap_mode='r')
+            a.flags.writeable = False
+            data[name] = a
+        yield data
+    finally:
+        data.clear()
+        for shm in opened:
+            try:
+                shm.close()
+            except BufferError:    # a view is still alive in user code
+                pass
+
+
+def _open_shm(name):
+    ''' Open an existing segment without letting this process own it '''
+    from multiprocessing import shared_memory
+
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    # Before 3.13 attaching registers the segment to the resource tracker,
+    # which would unlink it (or warn) when the worker exits. The parent owns it.
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+    return shm
+
+
+# %% Worker pool
+
+_worker_handles = None
+
+
+def _init_worker(handles, style, backend):
+    global _worker_handles
+    import matplotlib
+    matplotlib.use(backend)
+    from publib.main import set_style
+    set_style(style)
+    _worker_handles = handles
+
+
+def _run_job(plot_fn, job):
+    with attached(_worker_handles) as data:
+        return plot_fn(data, job)
+
+
+def plot_in_workers(plot_fn, arrays, jobs, style='basic', processes=None,
+                    backend='shm', mpl_backend='Agg'):
+    ''' Run ``plot_fn(data, job)`` for every job in a pool of worker processes.
+    ``data`` is a dict of the ``arrays``, shared zero-copy between workers.
+    Each worker applies ``set_style(style)`` once, when it starts.
+
+    Parameters
+    ----------
+    plot_fn: function
+        ``plot_fn(data, job)``. Must be picklable (defined at module level).
+        Typically plots and saves a figure, and returns its path.
+    arrays: dict of numpy arrays
+        input data
+    jobs: iterable
+        one element per call of ``plot_fn``
+    style: str or list of str
+        publib style applied in workers. See :func:`~publib.main.set_style`
+    processes: int
+        number of workers. If None, use the number of CPUs.
+    backend: ``'shm'``, ``'memmap'``
+        see :class:`~publib.tools.shared.SharedArrays`
+    mpl_backend: str
+        Matplotlib backend used in workers
+
+    Returns
+    -------
+    list of ``plot_fn`` results, in the order of ``jobs``
+
+    Notes
+    -----
+
+    Shared data is released when this function returns or raises, including
+    when a worker dies (``BrokenProcessPool``).
+
+    '''
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = list(jobs)
+
+    with SharedArrays(arrays, backend=backend) as shared:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(shared.handles, style, mpl_backend)) as pool:
+            futures = [pool.submit(_run_job, plot_fn, job) for job in jobs]
+            return [f.result() for f in futures]
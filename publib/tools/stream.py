@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Plot time series larger than memory
+
+Use::
+
+    set_style('article')
+    plot_stream('signal.npy')
+    fix_style('article')
+
+Data are read chunk by chunk (``.npy`` files are memory-mapped; any array-like
+that supports slicing, such as a h5py dataset, also works) and reduced to
+a min/max envelope with one bin per pixel of the saved figure. Only the
+envelope is plotted: it looks the same as the full line once rasterized,
+and peak memory depends on the chunk size, not on the data size.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+from six import string_types
+
+
+def plot_stream(y, x=None, ax=None, npix=None, chunksize=2**20, **kwargs):
+    ''' Plot the min/max envelope of ``y`` versus ``x``, one bin per pixel
+
+    Parameters
+    ----------
+    y: str or array-like
+        path to a ``.npy`` file (memory-mapped), or any 1D array-like that
+        supports slicing
+    x: str or array-like
+        same as ``y``, sorted in increasing order. If None, the sample index is
+        used.
+    ax: a matplotlib axe.
+        If None, the current axe is used
+    npix: int
+        number of bins. If None, the width of the axe in pixels once saved,
+        from the figure size and ``savefig.dpi`` of the current style.
+    chunksize: int
+        number of samples read at once
+    kwargs: dict
+        forwarded to ``ax.plot``
+
+    Returns
+    -------
+    list of Line2D, as ``ax.plot``
+
+    Notes
+    -----
+
+    The envelope is computed for the full x-range once: zooming in afterwards
+    does not reveal more details.
+
+    '''
+
+    if ax is None:
+        ax = plt.gca()
+    y = _open(y)
+    if x is not None:
+        x = _open(x)
+        if len(x) != len(y):
+            raise ValueError('x and y should have the same length. Got {0}, {1}'.format(
+                len(x), len(y)))
+    if npix is None:
+        npix = _get_npix(ax)
+
+    xb, lo, hi = _envelope(y, x, npix, chunksize)
+
+    # Empty bins (fewer samples than bins, or gaps in x) would break the line
+    # around every single-sample bin: connect the occupied bins instead
+    m = np.isfinite(lo)
+    xb, lo, hi = xb[m], lo[m], hi[m]
+
+    # Draw each bin as a vertical segment from min to max
+    xx = np.repeat(xb, 2)
+    yy = np.column_stack((lo, hi)).ravel()
+
+    return ax.plot(xx, yy, **kwargs)
+
+
+def _open(a):
+    if isinstance(a, string_types):
+        a = np.load(a, mmap_mode='r')
+    if len(np.shape(a)) != 1:
+        raise ValueError('Only 1D data can be streamed. Got shape {0}'.format(np.shape(a)))
+    return a
+
+
+def _get_npix(ax):
+    ''' Width of the axe in pixels, in the saved figure '''
+
+    dpi = mpl.rcParams['savefig.dpi']
+    if dpi == 'figure':
+        dpi = ax.figure.dpi
+    width = ax.get_position().width * ax.figure.get_figwidth()
+    return max(int(np.ceil(width * dpi)), 1)
+
+
+def _envelope(y, x, npix, chunksize):
+    ''' Min/max of y in npix bins equally spaced in x.
+
+    Returns
+    -------
+    xb, lo, hi: arrays of size npix
+        bin centers, min and max (NaN for empty bins)
+    '''
+
+    n = len(y)
+    lo = np.full(npix, np.nan)
+    hi = np.full(npix, np.nan)
+    if n == 0:
+        return np.full(npix, np.nan), lo, hi
+
+    if x is None:
+        xmin, xmax = 0., float(n - 1)
+    else:
+        xmin, xmax = float(x[0]), float(x[n - 1])
+    if xmax == xmin:
+        xmax = xmin + 1.
+    edges = np.linspace(xmin, xmax, npix + 1)
+
+    for start in range(0, n, chunksize):
+        stop = min(start + chunksize, n)
+        yc = np.asarray(y[start:stop], dtype=float)
+        if x is None:
+            xc = np.arange(start, stop, dtype=float)
+        else:
+            xc = np.asarray(x[start:stop], dtype=float)
+
+        # x is sorted: each bin is a contiguous slice of the chunk
+        bins = np.clip(np.searchsorted(edges, xc, side='right') - 1, 0, npix - 1)
+        first = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+        b = bins[first]
+        lo[b] = np.fmin(lo[b], np.fmin.reduceat(yc, first))
+        hi[b] = np.fmax(hi[b], np.fmax.reduceat(yc, first))
+
+    xb = (edges[:-1] + edges[1:]) / 2
+
+    return xb, lo, hi
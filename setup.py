@@ -40,5 +40,8 @@ setup(name='publib',
         'Programming Language :: Python :: 3.4',
         'Programming Language :: Python :: 3.5',
         "Operating System :: OS Independent"],
+      entry_points={
+          'console_scripts': ['publib=publib.cli:main'],
+          },
 	  include_package_data=True,
       zip_safe=False)